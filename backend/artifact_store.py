@@ -0,0 +1,335 @@
+"""
+artifact_store.py — On-disk cache of generated downloads, served with HTTP validators.
+
+Artifacts are stored under a digest of (CSV, config, logo, format, output
+profile, rendering code), so repeating a /generate call serves the stored
+file instead of re-rendering every invoice, and GET /artifacts/{id} supports
+ETag, Last-Modified and single-range requests for resuming interrupted
+downloads. Invoices carry customer details, so artifacts also expire after
+MAX_AGE_SECONDS.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterator, Optional
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from render_profile import RenderProfile
+
+ARTIFACT_DIR = os.environ.get(
+    "INVOICEKIT_ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "invoicekit-artifacts")
+)
+MAX_STORE_BYTES = int(os.environ.get("INVOICEKIT_ARTIFACT_MAX_BYTES", 2 * 1024**3))
+MAX_AGE_SECONDS = int(os.environ.get("INVOICEKIT_ARTIFACT_MAX_AGE", 24 * 3600))
+
+# Modules whose code decides what ends up in an artifact. Their source is
+# part of every artifact id, so a store that survives a deploy never serves
+# invoices rendered by older code.
+RENDER_MODULES = ("csv_parser.py", "tax_logic.py", "render_profile.py",
+                  "invoice_generator.py", "output_profiles.py")
+
+CHUNK_SIZE = 256 * 1024
+
+# format → (file extension, media type, download filename)
+ARTIFACT_TYPES = {
+    "single": ("pdf", "application/pdf", "invoices.pdf"),
+    "zip": ("zip", "application/zip", "invoices.zip"),
+    "tar": ("tar", "application/x-tar", "invoices.tar"),
+}
+
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{64}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def _code_version() -> str:
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDER_MODULES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def artifact_id(csv_bytes: bytes, profile: RenderProfile, format: str, output_profile: str) -> str:
+    """Deterministic id for the download these inputs produce."""
+    parts = [
+        hashlib.sha256(csv_bytes).hexdigest(),
+        profile.config_digest,
+        profile.logo_digest,
+        format,
+        output_profile,
+        CODE_VERSION,
+    ]
+    return hashlib.sha256(":".join(parts).encode()).hexdigest()
+
+
+def find_artifact(artifact: str) -> Optional[tuple[str, str]]:
+    """(path, format) of a stored artifact, or None if it isn't (or is no longer) stored."""
+    if not _ARTIFACT_ID.match(artifact):
+        return None
+    for format, (ext, _, _) in ARTIFACT_TYPES.items():
+        path = _path(artifact, ext)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            continue
+        if _expired(mtime):
+            _remove(path)
+            return None
+        return path, format
+    return None
+
+
+def store_artifact(artifact: str, format: str, data: bytes) -> str:
+    """Atomically write an artifact and return its path."""
+    path = _path(artifact, ARTIFACT_TYPES[format][0])
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _evict(keep=path)
+    return path
+
+
+def stream_artifact(artifact: str, format: str, chunks: Iterator[bytes]) -> StreamingResponse:
+    """
+    Stream an artifact as it is produced, storing it on the way (tee_artifact).
+    The ETag and Last-Modified sent up front are the ones the stored file will
+    have, so an interrupted download can be resumed from GET /artifacts/{id}
+    with Range + If-Range.
+    """
+    _, media_type, filename = ARTIFACT_TYPES[format]
+    mtime_ns = time.time_ns()
+    return StreamingResponse(
+        tee_artifact(artifact, format, chunks, mtime_ns),
+        media_type=media_type,
+        headers={
+            "ETag": f'"{artifact}-{mtime_ns:x}"',
+            "Last-Modified": formatdate(mtime_ns / 1e9, usegmt=True),
+            "Content-Location": f"/artifacts/{artifact}",
+            "X-Artifact-Id": artifact,
+            "Content-Disposition": f"attachment; filename={filename}",
+        },
+    )
+
+
+def tee_artifact(artifact: str, format: str, chunks: Iterator[bytes],
+                 mtime_ns: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Pass a streamed artifact through while writing it to the store, stamped
+    with mtime_ns (default: when it completes). If the client disconnects,
+    the rest is produced on a background thread, so the artifact still lands
+    in the store and the download can be resumed.
+    """
+    path = _path(artifact, ARTIFACT_TYPES[format][0])
+    tmp = _tmp_path(path)
+    chunks = iter(chunks)
+    f = open(tmp, "wb")
+    try:
+        for chunk in chunks:
+            f.write(chunk)
+            yield chunk
+    except GeneratorExit:
+        threading.Thread(
+            target=_finish_artifact, args=(chunks, f, tmp, path, mtime_ns),
+            name=f"artifact-{artifact[:12]}", daemon=True,
+        ).start()
+        raise
+    except BaseException:
+        f.close()
+        _remove(tmp)
+        raise
+    _finish_artifact(iter(()), f, tmp, path, mtime_ns)
+
+
+def artifact_response(path: str, format: str, artifact: str, method: str = "GET",
+                      headers: Optional[dict] = None) -> Response:
+    """
+    Serve a stored artifact. For GET, honours If-None-Match / If-Modified-Since
+    (304) and a single `Range: bytes=` range, guarded by If-Range (206 / 416).
+    Other methods always get the full file, as Range only applies to GET.
+    """
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    _, media_type, filename = ARTIFACT_TYPES[format]
+    st = os.stat(path)
+    # Bump atime only: recently served artifacts are evicted last, ETag stays put
+    os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+    etag = f'"{artifact}-{st.st_mtime_ns:x}"'
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    base_headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "X-Artifact-Id": artifact,
+        "Content-Disposition": f"attachment; filename={filename}",
+    }
+
+    if method == "GET":
+        if _not_modified(headers, etag, st.st_mtime):
+            return Response(status_code=304, headers=base_headers)
+
+        range_header = headers.get("range")
+        if range_header and _if_range_matches(headers.get("if-range"), etag, st.st_mtime):
+            try:
+                byte_range = _parse_range(range_header, st.st_size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={**base_headers, "Content-Range": f"bytes */{st.st_size}"})
+            if byte_range is not None:
+                start, end = byte_range
+                return StreamingResponse(
+                    _read_range(path, start, end),
+                    status_code=206,
+                    media_type=media_type,
+                    headers={
+                        **base_headers,
+                        "Content-Range": f"bytes {start}-{end}/{st.st_size}",
+                        "Content-Length": str(end - start + 1),
+                    },
+                )
+
+    return FileResponse(path, media_type=media_type, headers=base_headers, stat_result=st)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _path(artifact: str, ext: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"{artifact}.{ext}")
+
+
+def _tmp_path(path: str) -> str:
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return f"{path}.{uuid.uuid4().hex}.tmp"
+
+
+def _finish_artifact(rest: Iterator[bytes], f, tmp: str, path: str, mtime_ns: Optional[int]):
+    """Write the remaining chunks, then move the artifact into place (or drop it on error)."""
+    try:
+        with f:
+            for chunk in rest:
+                f.write(chunk)
+        if mtime_ns is not None:
+            os.utime(tmp, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Error storing artifact {os.path.basename(path)}: {e}")
+        _remove(tmp)
+        return
+    _evict(keep=path)
+
+
+def _expired(mtime: float) -> bool:
+    return time.time() - mtime > MAX_AGE_SECONDS
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _evict(keep: Optional[str] = None):
+    """
+    Drop artifacts older than MAX_AGE_SECONDS, then least recently used ones
+    (except `keep`) until the store fits MAX_STORE_BYTES.
+    """
+    entries = []
+    with os.scandir(ARTIFACT_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".tmp") or entry.path == keep:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except FileNotFoundError:
+                # Removed by a concurrent eviction or expiry
+                continue
+            if _expired(st.st_mtime):
+                _remove(entry.path)
+            else:
+                entries.append((st.st_atime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_STORE_BYTES:
+            break
+        _remove(path)
+        total -= size
+
+
+def _not_modified(headers: dict, etag: str, mtime: float) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, mtime: float) -> bool:
+    """No If-Range, or one that still matches the stored file → honour Range."""
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single `bytes=` range, or None to serve the
+    whole file (multi-range or unparseable headers). Raises RangeNotSatisfiable.
+    """
+    m = _RANGE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,144 @@
+"""
+bench_csv_ingest.py — Parity check and timing for the two CSV ingest engines.
+Run: python bench_csv_ingest.py orders_export.csv [--repeat N]
+     python bench_csv_ingest.py --synthetic
+
+Parses the export with engine="python" and engine="columnar", exits
+non-zero if the orders differ in any way, then prints the best-of-N time
+for each engine (pandas import excluded) and the speedup.
+
+--synthetic skips the timing and checks parity on small generated CSVs
+covering the inputs where the engines could drift apart: non-contiguous
+and padded order names, fractional/overflowing quantities, unparseable
+and thousands-separated amounts, missing and repeated columns and an
+empty file.
+"""
+
+import argparse
+import csv
+import io
+import sys
+import time
+
+from csv_parser import USED_COLUMNS, parse_shopify_csv
+
+
+def synthetic_cases() -> dict[str, bytes]:
+    """Named edge-case exports for the parity check."""
+    columns = ["Name", *sorted(USED_COLUMNS - {"Name"}), "Notes"]
+
+    def export(header: list[str], rows: list[dict]) -> bytes:
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=header, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        return out.getvalue().encode("utf-8")
+
+    def repeated(rows: list[dict]) -> bytes:
+        """Export whose Lineitem name and Subtotal columns appear twice."""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow([*columns, "Lineitem name", "Subtotal"])
+        for i, row in enumerate(rows):
+            extra = [f"Dup item {i}" if i % 2 else "", "" if i % 3 else "99.5"]
+            writer.writerow([row.get(c, "") for c in columns] + extra)
+        return out.getvalue().encode("utf-8")
+
+    def order(name: str, **fields) -> dict:
+        row = {
+            "Name": name, "Created at": "2024-03-01 10:00:00 +0530",
+            "Billing Name": "Asha Rao", "Billing Province": "KA", "Billing Country": "IN",
+            "Subtotal": "100.00", "Shipping": "10", "Taxes": "18.00", "Total": "128.00",
+            "Lineitem name": "Mug", "Lineitem quantity": "1", "Lineitem price": "100.00",
+            "Lineitem discount": "0", "Notes": "unused",
+        }
+        row.update(fields)
+        return row
+
+    def item(name: str, **fields) -> dict:
+        return {"Name": name, "Lineitem name": "Coaster", "Lineitem quantity": "2",
+                "Lineitem price": "25", **fields}
+
+    rows = [
+        order("#1001"),
+        order("#1002", **{"Billing Name": "", "Billing First Name": "Ravi", "Billing Last Name": "K"}),
+        item("#1001"),                                   # #1001 continues after #1002
+        order("  #1003  ", **{"Subtotal": "1,234.50", "Total": "abc", "Shipping": ""}),
+        item("#1003", **{"Lineitem quantity": "2.0"}),   # same order, unpadded name
+        item("#1003", **{"Lineitem quantity": "99999999999999999999"}),
+        item("#1003", **{"Lineitem quantity": "", "Lineitem price": "abc", "Lineitem discount": "1,000"}),
+        order("#1004", **{"Subtotal": "", "Lineitem name": ""}),   # address-only row, dropped
+        order("", **{"Subtotal": "50"}),                 # no Name, skipped
+        order("#1005", **{"Subtotal": "0", "Lineitem quantity": "-1", "Taxes": "nan"}),
+        item("#1002", **{"Lineitem name": "  Spoon  ", "Lineitem sku": " SP-1 "}),
+    ]
+    return {
+        "edge cases": export(columns, rows),
+        "missing columns": export(["Name", "Subtotal", "Lineitem name"], rows),
+        "repeated columns": repeated(rows),
+        "header only": export(columns, []),
+        "empty file": b"",
+    }
+
+
+def check_parity(file_bytes: bytes) -> tuple[bool, str]:
+    """(engines agree, message) for one export."""
+    columnar = parse_shopify_csv(file_bytes, engine="columnar")
+    rows = parse_shopify_csv(file_bytes, engine="python")
+
+    # repr() so NaN amounts (float("nan") in the CSV) compare equal to themselves
+    if repr(rows) == repr(columnar):
+        return True, f"{len(rows)} orders — parity OK"
+    for i, (a, b) in enumerate(zip(rows, columnar)):
+        if repr(a) != repr(b):
+            return False, f"MISMATCH at order {i}:\n  python:   {a}\n  columnar: {b}"
+    return False, f"MISMATCH: {len(rows)} orders (python) vs {len(columnar)} (columnar)"
+
+
+def best_of(file_bytes: bytes, engine: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_shopify_csv(file_bytes, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Compare CSV ingest engines.")
+    parser.add_argument("csv", nargs="?", help="Shopify orders export")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="check parity on generated edge-case CSVs instead of an export")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        failed = False
+        for name, file_bytes in synthetic_cases().items():
+            ok, message = check_parity(file_bytes)
+            print(f"{name:<16} {message}")
+            failed |= not ok
+        sys.exit(1 if failed else 0)
+    if not args.csv:
+        parser.error("pass an orders export or --synthetic")
+
+    with open(args.csv, "rb") as f:
+        file_bytes = f.read()
+
+    start = time.perf_counter()
+    ok, message = check_parity(file_bytes)
+    first_columnar = time.perf_counter() - start
+    if not ok:
+        print(message)
+        sys.exit(1)
+
+    python_s = best_of(file_bytes, "python", args.repeat)
+    columnar_s = best_of(file_bytes, "columnar", args.repeat)
+    print(f"{len(file_bytes) / 1e6:.1f} MB, {message}")
+    print(f"python     {python_s:>8.3f} s")
+    print(f"columnar   {columnar_s:>8.3f} s   (parity check incl. pandas import: {first_columnar:.3f} s)")
+    print(f"speedup    {python_s / columnar_s:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
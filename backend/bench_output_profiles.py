@@ -0,0 +1,63 @@
+"""
+bench_output_profiles.py — Render and encoding cost of each output profile.
+Run: python bench_output_profiles.py orders.csv config.json [logo.png]
+
+Invoices are rendered once per page-compression setting (reported as the
+`render` rows), then each ZIP profile only re-encodes those PDFs, so the
+zip rows show the archive cost alone — e.g. deflate vs stored on PDFs that
+ReportLab already compressed. TAR encoding doesn't depend on the ZIP
+settings, so it gets one row per page-compression setting.
+"""
+
+import sys
+import time
+
+from csv_parser import parse_shopify_csv
+from invoice_generator import build_bulk_pdf, build_invoice_pdf
+from output_profiles import OUTPUT_PROFILES, encode_tar, encode_zip
+from render_profile import get_render_profile
+
+
+def timed(fn) -> tuple[float, object]:
+    start = time.process_time()
+    result = fn()
+    return time.process_time() - start, result
+
+
+def main(argv: list[str]) -> None:
+    if len(argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    with open(argv[1], "rb") as f:
+        orders = parse_shopify_csv(f.read())
+    with open(argv[2], encoding="utf-8") as f:
+        config_json = f.read()
+    logo_bytes = None
+    if len(argv) > 3:
+        with open(argv[3], "rb") as f:
+            logo_bytes = f.read()
+    profile = get_render_profile(config_json, logo_bytes)
+
+    print(f"{len(orders)} orders")
+    print(f"{'step':<8} {'profile':<12} {'pages':<6} {'cpu_s':>8} {'bytes':>12}")
+    for page_compression in (True, False):
+        pages = "comp" if page_compression else "raw"
+        cpu, files = timed(lambda: [
+            (f"invoice_{i}.pdf", build_invoice_pdf(order, profile, page_compression=page_compression))
+            for i, order in enumerate(orders)
+        ])
+        print(f"{'render':<8} {'(per-order)':<12} {pages:<6} {cpu:>8.3f} {sum(len(pdf) for _, pdf in files):>12}")
+        cpu, pdf = timed(lambda: build_bulk_pdf(orders, profile, page_compression=page_compression))
+        print(f"{'render':<8} {'(single)':<12} {pages:<6} {cpu:>8.3f} {len(pdf):>12}")
+
+        cpu, size = timed(lambda: sum(len(chunk) for chunk in encode_tar(files)))
+        print(f"{'tar':<8} {'-':<12} {pages:<6} {cpu:>8.3f} {size:>12}")
+        for output in OUTPUT_PROFILES.values():
+            if output.page_compression != page_compression:
+                continue
+            cpu, data = timed(lambda: encode_zip(files, output))
+            print(f"{'zip':<8} {output.name:<12} {pages:<6} {cpu:>8.3f} {len(data):>12}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
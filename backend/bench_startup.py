@@ -0,0 +1,100 @@
+"""
+bench_startup.py — Import-time audit and cold-start benchmark.
+Run: python bench_startup.py [orders.csv config.json] [--runs N] [--top N]
+
+Each run is a fresh interpreter, like a scaled-from-zero instance:
+  boot_ms         import main (what uvicorn does before serving)
+  warmup_ms       the lifespan warmup (throwaway invoice)
+  first_ms        first real invoice after boot + warmup
+  cold_first_ms   first real invoice after boot with no warmup
+Then prints the slowest top-level imports from `python -X importtime -c "import main"`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+boot = time.perf_counter() - t0
+warmup = 0.0
+if sys.argv[1] == "warm":
+    t = time.perf_counter()
+    main._warm_up()
+    warmup = time.perf_counter() - t
+from csv_parser import parse_shopify_csv
+from render_profile import get_render_profile
+if len(sys.argv) > 3:
+    orders = parse_shopify_csv(open(sys.argv[2], "rb").read())
+    config_json = open(sys.argv[3], encoding="utf-8").read()
+else:
+    from invoice_generator import WARMUP_ORDER
+    orders, config_json = [WARMUP_ORDER], "{}"
+t = time.perf_counter()
+from invoice_generator import build_invoice_pdf
+build_invoice_pdf(orders[0], get_render_profile(config_json))
+first = time.perf_counter() - t
+print(json.dumps({"boot": boot, "warmup": warmup, "first": first}))
+"""
+
+
+def _child(mode: str, extra: list[str]) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, mode, *extra],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_audit(top: int) -> list[tuple[int, str]]:
+    """(cumulative µs, module) for the slowest modules imported directly or by main."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Depth of indentation = nesting; keep main and what it pulls in directly
+        if len(name) - len(name.lstrip()) <= 3:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Measure InvoiceKit cold start.")
+    parser.add_argument("csv", nargs="?", help="orders CSV for the first real invoice")
+    parser.add_argument("config", nargs="?", help="config JSON for the first real invoice")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    extra = [args.csv, args.config] if args.csv and args.config else []
+
+    warm = [_child("warm", extra) for _ in range(args.runs)]
+    cold = [_child("cold", extra) for _ in range(args.runs)]
+
+    def med(runs, key):
+        return statistics.median(r[key] for r in runs) * 1000
+
+    print(f"median of {args.runs} fresh interpreters")
+    print(f"boot_ms        {med(warm + cold, 'boot'):>8.1f}")
+    print(f"warmup_ms      {med(warm, 'warmup'):>8.1f}")
+    print(f"first_ms       {med(warm, 'first'):>8.1f}")
+    print(f"cold_first_ms  {med(cold, 'first'):>8.1f}")
+    print()
+    print("slowest imports under `import main` (cumulative ms)")
+    for cumulative, name in import_audit(args.top):
+        print(f"{cumulative / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
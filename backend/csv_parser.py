@@ -1,19 +1,88 @@
 """
 csv_parser.py — Parse Shopify order export CSV into order dicts.
 Filters to real order rows (Subtotal != '') and groups line items by order Name.
+
+Two engines produce identical orders: the row-by-row csv.DictReader path,
+and a columnar path on pandas' C parser that reads only the ~26 columns we
+use (out of Shopify's ~70) and converts numbers a column at a time. The
+columnar path wins on large exports but pandas costs ~0.4 s to import, so
+"auto" only uses it above COLUMNAR_MIN_BYTES.
+Run bench_csv_ingest.py to check parity and speed on a real export, or
+with --synthetic to check parity on generated edge cases.
 """
 
 import io
 import csv
 from typing import Any
 
+COLUMNAR_MIN_BYTES = 8 * 1024 * 1024
+
+# Order-level columns → order dict keys (taken from an order's first row)
+ORDER_COLUMNS = {
+    "Created at": "created_at",
+    "Billing Address1": "billing_address1",
+    "Billing Address2": "billing_address2",
+    "Billing City": "billing_city",
+    "Billing Zip": "billing_zip",
+    "Billing Province": "billing_province",
+    "Billing Province Name": "billing_province_name",
+    "Billing Country": "billing_country",
+    "Email": "email",
+    "Phone": "phone",
+    "Payment Method": "payment_method",
+    "Fulfillment Status": "fulfillment_status",
+}
+ORDER_AMOUNT_COLUMNS = {
+    "Subtotal": "subtotal",
+    "Shipping": "shipping",
+    "Taxes": "taxes",
+    "Total": "total",
+}
+NAME_COLUMNS = ["Billing Name", "Billing First Name", "Billing Last Name"]
+LINEITEM_COLUMNS = [
+    "Lineitem name", "Lineitem quantity", "Lineitem price",
+    "Lineitem sku", "Lineitem discount", "Lineitem variant title",
+]
+# Key order of the order dicts _parse_rows builds
+ORDER_KEYS = [
+    "order_number", "created_at", "customer_name",
+    "billing_address1", "billing_address2", "billing_city", "billing_zip",
+    "billing_province", "billing_province_name", "billing_country",
+    "email", "phone", "subtotal", "shipping", "taxes", "total",
+    "payment_method", "fulfillment_status",
+]
+USED_COLUMNS = frozenset(
+    ["Name", *ORDER_COLUMNS, *ORDER_AMOUNT_COLUMNS, *NAME_COLUMNS, *LINEITEM_COLUMNS]
+)
+
 
-def parse_shopify_csv(file_bytes: bytes) -> list[dict[str, Any]]:
+def parse_shopify_csv(file_bytes: bytes, engine: str = "auto") -> list[dict[str, Any]]:
     """
     Parse Shopify order export CSV bytes into a list of order dicts.
     Each order dict contains company/shipping info + a list of line items.
     Returns orders in the order they first appear in the CSV.
+
+    engine: "python" (csv.DictReader), "columnar" (pandas C parser) or "auto"
+    (columnar for inputs of COLUMNAR_MIN_BYTES or more when pandas is installed).
+    Raises ValueError for any other engine.
     """
+    if engine not in ("auto", "python", "columnar"):
+        raise ValueError(f"Unknown CSV engine: {engine!r}")
+    if engine == "columnar":
+        return _parse_columnar(file_bytes)
+    if engine == "auto" and len(file_bytes) >= COLUMNAR_MIN_BYTES:
+        try:
+            return _parse_columnar(file_bytes)
+        except ImportError:
+            pass
+        except ValueError:
+            # Ragged rows the C parser rejects (pandas.errors.ParserError);
+            # DictReader tolerates them
+            pass
+    return _parse_rows(file_bytes)
+
+
+def _parse_rows(file_bytes: bytes) -> list[dict[str, Any]]:
     text = file_bytes.decode("utf-8-sig")  # handle BOM
     reader = csv.DictReader(io.StringIO(text))
 
@@ -67,6 +136,154 @@ def parse_shopify_csv(file_bytes: bytes) -> list[dict[str, Any]]:
     return [o for o in orders.values() if o["subtotal"] > 0 or o["line_items"]]
 
 
+def _parse_columnar(file_bytes: bytes) -> list[dict[str, Any]]:
+    """Same result as _parse_rows, built column-at-a-time from pandas' C parser."""
+    import pandas as pd
+
+    header = next(csv.reader(io.TextIOWrapper(io.BytesIO(file_bytes), encoding="utf-8-sig", newline="")), [])
+    # A repeated header keeps its last column in DictReader but its first in
+    # pandas, so pick the columns by position, last occurrence winning
+    positions = {name: i for i, name in enumerate(header) if name in USED_COLUMNS}
+    if "Name" not in positions:
+        return []
+    usecols = sorted(positions.values())
+    df = pd.read_csv(
+        io.BytesIO(file_bytes),
+        encoding="utf-8-sig",
+        usecols=usecols,
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        engine="c",
+    )
+    df.columns = [header[i] for i in usecols]
+    return _orders_from_frame(df)
+
+
+def _orders_from_frame(df) -> list[dict[str, Any]]:
+    """Order dicts from the pruned all-string frame read by _parse_columnar."""
+    import numpy as np
+    import pandas as pd
+
+    raw = {c: df[c].to_numpy(dtype=object) for c in df.columns}
+
+    def column(name: str, rows: np.ndarray | None = None, strip: bool = True) -> list[str]:
+        """
+        Values of one column, optionally at the given row positions ("" if absent).
+        Numeric columns skip the strip: float() and int() ignore surrounding whitespace.
+        """
+        if name not in raw:
+            return [""] * (len(df) if rows is None else len(rows))
+        values = (raw[name] if rows is None else raw[name][rows]).tolist()
+        try:
+            if strip:
+                return list(map(str.strip, values))
+            "".join(values)   # type check only, far cheaper than pd.isna
+            return values
+        except TypeError:
+            # Short rows are padded with NaN even with na_filter off
+            values = [v if isinstance(v, str) else "" for v in values]
+            return list(map(str.strip, values)) if strip else values
+
+    names = np.array(column("Name"), dtype=object)
+    valid_rows = np.flatnonzero(names != "")
+    # Order index of every valid row, numbered by first appearance
+    codes, order_names = pd.factorize(names[valid_rows])
+    first_rows = valid_rows[np.unique(codes, return_index=True)[1]]
+
+    # Order-level fields: only each order's first row is ever read
+    fields = {
+        "order_number": order_names.tolist(),
+        "customer_name": [
+            full or f"{first} {last}".strip()
+            for full, first, last in zip(
+                column("Billing Name", first_rows),
+                column("Billing First Name", first_rows),
+                column("Billing Last Name", first_rows),
+            )
+        ],
+    }
+    fields.update({key: column(col, first_rows) for col, key in ORDER_COLUMNS.items()})
+    fields.update({key: _float_column(column(col, first_rows, strip=False)) for col, key in ORDER_AMOUNT_COLUMNS.items()})
+
+    # Line items grouped by order: stable sort by order index, then slice per order
+    has_item = np.array(column("Lineitem name", valid_rows), dtype=object) != ""
+    item_codes = codes[has_item]
+    item_rows = valid_rows[has_item][np.argsort(item_codes, kind="stable")]
+    counts = np.bincount(item_codes, minlength=len(order_names))
+    ends = np.cumsum(counts)
+    # Orders with neither a subtotal nor line items are dropped, as in _parse_rows
+    keep = np.flatnonzero((np.array(fields["subtotal"]) > 0) | (counts > 0))
+
+    all_items = [
+        {"name": n, "quantity": q, "price": p, "sku": s, "discount": d, "variant": v}
+        for n, q, p, s, d, v in zip(
+            column("Lineitem name", item_rows),
+            _int_column(column("Lineitem quantity", item_rows, strip=False)),
+            _float_column(column("Lineitem price", item_rows, strip=False)),
+            column("Lineitem sku", item_rows),
+            _float_column(column("Lineitem discount", item_rows, strip=False)),
+            column("Lineitem variant title", item_rows),
+        )
+    ]
+
+    line_items = [all_items[start:end] for start, end in zip((ends - counts)[keep].tolist(), ends[keep].tolist())]
+    columns = [fields[key] for key in ORDER_KEYS]
+    if len(keep) < len(order_names):
+        columns = [np.array(values, dtype=object)[keep].tolist() for values in columns]
+    keys = [*ORDER_KEYS, "line_items"]
+    return [dict(zip(keys, values)) for values in zip(*columns, line_items)]
+
+
+def _float_column(values: list[str]) -> list[float]:
+    """
+    _float over a whole column. numpy's object→float cast runs Python's own
+    string parser in C (pd.to_numeric rounds some long decimals differently),
+    so it is only used to find the values the cast rejects — empty, "abc" —
+    which then go through _float one at a time.
+    """
+    import numpy as np
+
+    if "," in "\x00".join(values):
+        values = [v.replace(",", "") for v in values]
+    column = np.array(values, dtype=object)
+    try:
+        return column.astype(float).tolist()
+    except ValueError:
+        pass
+    return _convert_with_fallback(column, float, _float)
+
+
+def _int_column(values: list[str]) -> list[int]:
+    """_int over a whole column, with the same per-value fallback as _float_column."""
+    import numpy as np
+
+    column = np.array(values, dtype=object)
+    try:
+        return column.astype(np.int64).tolist()
+    except (ValueError, OverflowError):
+        pass
+    return _convert_with_fallback(column, np.int64, _int)
+
+
+def _convert_with_fallback(column, dtype, convert) -> list:
+    """Cast the values pandas can parse in one go and convert the rest with `convert`."""
+    import numpy as np
+    import pandas as pd
+
+    bad = pd.isna(pd.to_numeric(column, errors="coerce"))
+    good = ~bad
+    try:
+        converted = column[good].astype(dtype)
+    except (ValueError, OverflowError):
+        # e.g. "2.0" or 20-digit quantities, which pandas parses but int64 can't hold
+        return [convert(v) for v in column.tolist()]
+    out = np.empty(len(column), dtype=object)
+    out[good] = converted.tolist()
+    out[bad] = [convert(v) for v in column[bad].tolist()]
+    return out.tolist()
+
+
 def _full_name(row: dict) -> str:
     first = row.get("Billing Name", "").strip()
     if first:
@@ -5,7 +5,7 @@ Generates GST-compliant PDF invoices from order data and company config.
 
 import io
 import os
-from typing import Any
+from functools import lru_cache
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -18,7 +18,8 @@ from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
-from tax_logic import compute_tax_breakdown
+from render_profile import InvoiceConfig, RenderProfile, compile_render_profile
+from tax_logic import compute_order_tax
 
 # ---------------------------------------------------------------------------
 # Font setup — bundle Arial TTF so Render doesn't need Windows fonts
@@ -62,13 +63,11 @@ W, H = A4  # 595.27 x 841.89 pts
 # Public API
 # ---------------------------------------------------------------------------
 
-def build_invoice_pdf(order: dict, config: dict, logo_bytes: bytes | None = None) -> bytes:
+def build_invoice_pdf(order: dict, profile: RenderProfile, page_compression: bool = True) -> bytes:
     """Build a single invoice PDF and return as bytes."""
-    company_conf = config.get("company", {})
-    prefix = company_conf.get("invoice_prefix", "")
-    start = company_conf.get("invoice_start_number", None)
-    if prefix and start is not None:
-        order = {**order, "invoice_number": f"{prefix}{int(start):03d}"}
+    invoice_number = profile.invoice_number()
+    if invoice_number:
+        order = {**order, "invoice_number": invoice_number}
     buf = io.BytesIO()
     doc = SimpleDocTemplate(
         buf,
@@ -77,19 +76,17 @@ def build_invoice_pdf(order: dict, config: dict, logo_bytes: bytes | None = None
         rightMargin=15*mm,
         topMargin=12*mm,
         bottomMargin=12*mm,
+        pageCompression=int(page_compression),
     )
-    tax = compute_tax_breakdown(order, config)
-    story = _build_story(order, config, tax, logo_bytes)
+    tax = compute_order_tax(order, profile.tax_rules, profile.seller_state)
+    story = _build_story(order, profile, tax)
     doc.build(story)
     return buf.getvalue()
 
 
-def build_bulk_pdf(orders: list[dict], config: dict, logo_bytes: bytes | None = None) -> bytes:
+def build_bulk_pdf(orders: list[dict], profile: RenderProfile, page_compression: bool = True) -> bytes:
     """Merge all orders into one PDF and return as bytes."""
     from reportlab.platypus import PageBreak
-    company_conf = config.get("company", {})
-    prefix = company_conf.get("invoice_prefix", "")
-    start = company_conf.get("invoice_start_number", None)
     buf = io.BytesIO()
     doc = SimpleDocTemplate(
         buf,
@@ -98,29 +95,68 @@ def build_bulk_pdf(orders: list[dict], config: dict, logo_bytes: bytes | None =
         rightMargin=15*mm,
         topMargin=12*mm,
         bottomMargin=12*mm,
+        pageCompression=int(page_compression),
     )
     story = []
     for i, order in enumerate(orders):
-        if prefix and start is not None:
-            order = {**order, "invoice_number": f"{prefix}{int(start) + i:03d}"}
-        tax = compute_tax_breakdown(order, config)
-        story.extend(_build_story(order, config, tax, logo_bytes))
+        invoice_number = profile.invoice_number(i)
+        if invoice_number:
+            order = {**order, "invoice_number": invoice_number}
+        tax = compute_order_tax(order, profile.tax_rules, profile.seller_state)
+        story.extend(_build_story(order, profile, tax))
         if i < len(orders) - 1:
             story.append(PageBreak())
     doc.build(story)
     return buf.getvalue()
 
 
+def warm_up() -> None:
+    """
+    Render one throwaway invoice (with a logo) so the first real request
+    doesn't pay for font loading, Pillow import and first-use code paths.
+    """
+    from PIL import Image as PILImage
+
+    logo = io.BytesIO()
+    PILImage.new("RGB", (4, 2), "white").save(logo, format="PNG")
+    config = InvoiceConfig.model_validate({
+        "company": {"name": "Warmup", "seller_state": "Maharashtra", "hsn_code": "0000"},
+        "tax_rules": [{"from": "2020-01-01", "to": None, "rate": 5}],
+    })
+    build_invoice_pdf(WARMUP_ORDER, compile_render_profile(config, logo.getvalue()))
+
+
+WARMUP_ORDER = {
+    "order_number": "#0",
+    "created_at": "2024-01-01 00:00:00 +0530",
+    "customer_name": "Warmup",
+    "billing_address1": "-",
+    "billing_address2": "",
+    "billing_city": "Mumbai",
+    "billing_zip": "400001",
+    "billing_province": "MH",
+    "billing_province_name": "Maharashtra",
+    "billing_country": "IN",
+    "phone": "",
+    "subtotal": 105.0,
+    "shipping": 0.0,
+    "total": 105.0,
+    "payment_method": "Prepaid",
+    "line_items": [
+        {"name": "Item", "quantity": 1, "price": 105.0, "sku": "W-1", "discount": 0.0, "variant": "M"},
+    ],
+}
+
+
 # ---------------------------------------------------------------------------
 # Internal story builder
 # ---------------------------------------------------------------------------
 
-def _build_story(order: dict, config: dict, tax: dict, logo_bytes: bytes | None) -> list:
-    company = config.get("company", {})
+def _build_story(order: dict, profile: RenderProfile, tax: dict) -> list:
     story = []
 
     # --- Header ---
-    story.extend(_header(company, logo_bytes))
+    story.extend(_header(profile))
     story.append(Spacer(1, 4*mm))
     story.append(HRFlowable(width="100%", thickness=1, color=BRAND_ACCENT))
     story.append(Spacer(1, 3*mm))
@@ -130,11 +166,11 @@ def _build_story(order: dict, config: dict, tax: dict, logo_bytes: bytes | None)
     story.append(Spacer(1, 4*mm))
 
     # --- Billing address + company info two-col ---
-    story.extend(_address_block(order, company))
+    story.extend(_address_block(order, profile))
     story.append(Spacer(1, 5*mm))
 
     # --- Line items table ---
-    story.extend(_line_items_table(order, tax, company))
+    story.extend(_line_items_table(order, tax, profile.hsn_code))
     story.append(Spacer(1, 4*mm))
 
     # --- Totals ---
@@ -142,14 +178,20 @@ def _build_story(order: dict, config: dict, tax: dict, logo_bytes: bytes | None)
     story.append(Spacer(1, 4*mm))
 
     # --- Footer ---
-    story.extend(_footer(company))
+    story.extend(_footer(profile))
 
     return story
 
 
 def _para(text: str, size: int = 9, bold: bool = False,
           align=TA_LEFT, color=TEXT_DARK, leading: int = None) -> Paragraph:
-    style = ParagraphStyle(
+    return Paragraph(str(text), _style(size, bold, align, color, leading))
+
+
+@lru_cache(maxsize=None)
+def _style(size: int, bold: bool, align, color, leading: int | None) -> ParagraphStyle:
+    # Only a handful of combinations exist, so build each once per process
+    return ParagraphStyle(
         name="custom",
         fontName=_font(bold),
         fontSize=size,
@@ -159,23 +201,22 @@ def _para(text: str, size: int = 9, bold: bool = False,
         spaceAfter=0,
         spaceBefore=0,
     )
-    return Paragraph(str(text), style)
 
 
 # ---------------------------------------------------------------------------
 # Header
 # ---------------------------------------------------------------------------
 
-def _header(company: dict, logo_bytes: bytes | None) -> list:
+def _header(profile: RenderProfile) -> list:
     logo_cell = ""
-    if logo_bytes:
+    if profile.logo:
         try:
-            img = Image(io.BytesIO(logo_bytes), width=40*mm, height=15*mm, kind="proportional")
+            img = Image(io.BytesIO(profile.logo), width=40*mm, height=15*mm, kind="proportional")
             logo_cell = img
         except Exception:
-            logo_cell = _para(company.get("name", ""), 14, bold=True, color=BRAND_DARK)
+            logo_cell = _para(profile.company_name, 14, bold=True, color=BRAND_DARK)
     else:
-        logo_cell = _para(company.get("name", ""), 14, bold=True, color=BRAND_DARK)
+        logo_cell = _para(profile.company_name, 14, bold=True, color=BRAND_DARK)
 
     right_block = [
         _para("TAX INVOICE", 16, bold=True, align=TA_RIGHT, color=BRAND_ACCENT),
@@ -220,7 +261,7 @@ def _invoice_meta(order: dict) -> list:
 # Address block
 # ---------------------------------------------------------------------------
 
-def _address_block(order: dict, company: dict) -> list:
+def _address_block(order: dict, profile: RenderProfile) -> list:
     # Buyer
     buyer_lines = [
         _para("Bill To", 8, bold=True, color=BRAND_ACCENT),
@@ -242,15 +283,9 @@ def _address_block(order: dict, company: dict) -> list:
     # Seller
     seller_lines = [
         _para("Sold By", 8, bold=True, color=BRAND_ACCENT),
-        _para(company.get("name", ""), 9, bold=True),
-        _para(company.get("address", ""), 8),
-        _para(f"GSTIN: {company.get('gstin', '')}", 8),
-        _para(f"State: {company.get('seller_state', '')} ({company.get('seller_state_code', '')})", 8),
+        _para(profile.company_name, 9, bold=True),
     ]
-    if company.get("email"):
-        seller_lines.append(_para(f"Email: {company['email']}", 8))
-    if company.get("website"):
-        seller_lines.append(_para(f"Web: {company['website']}", 8))
+    seller_lines.extend(_para(line, 8) for line in profile.seller_lines)
 
     tbl = Table(
         [[buyer_lines, seller_lines]],
@@ -274,10 +309,9 @@ def _address_block(order: dict, company: dict) -> list:
 # Line items table
 # ---------------------------------------------------------------------------
 
-def _line_items_table(order: dict, tax: dict, company: dict) -> list:
+def _line_items_table(order: dict, tax: dict, hsn: str) -> list:
     gst_type = tax["gst_type"]
     rate = tax["rate"]
-    hsn = company.get("hsn_code", "")
 
     # Header row
     if gst_type == "intra":
@@ -389,18 +423,10 @@ def _totals_block(order: dict, tax: dict) -> list:
 # Footer
 # ---------------------------------------------------------------------------
 
-def _footer(company: dict) -> list:
+def _footer(profile: RenderProfile) -> list:
     lines = [
         HRFlowable(width="100%", thickness=0.5, color=MID_GRAY),
         Spacer(1, 2*mm),
-        _para(
-            f"This is a computer-generated invoice. | {company.get('name','')} | "
-            f"GSTIN: {company.get('gstin','')}",
-            7, align=TA_CENTER, color=colors.gray
-        ),
     ]
-    if company.get("shipped_from"):
-        lines.append(_para(f"Shipped from: {company['shipped_from']}", 7, align=TA_CENTER, color=colors.gray))
-    if company.get("transport_mode"):
-        lines.append(_para(f"Transport: {company['transport_mode']}", 7, align=TA_CENTER, color=colors.gray))
+    lines.extend(_para(line, 7, align=TA_CENTER, color=colors.gray) for line in profile.footer_lines)
     return lines
@@ -0,0 +1,190 @@
+"""
+loadtest.py — Local load generator for the InvoiceKit API.
+Run: python loadtest.py --small orders_small.csv --big orders_big.csv --config config.json
+
+Replays a mixed workload (many small /preview calls, a few large /generate
+calls, /count polling) with a fixed number of concurrent clients, either
+in-process through httpx's ASGI transport (default) or against a running
+server (--base-url http://localhost:8000). Prints p50/p95/p99 latency,
+throughput and error rate per endpoint as fixed-width text or, with
+--json, sorted JSON — both stable enough to diff between runs.
+
+Every /generate call posts the same CSV, so it sends cache=false to make
+the server re-render instead of answering from the artifact store;
+--generate-cache lets repeats hit the store.
+
+Needs httpx (pip install httpx); it is not part of requirements.txt.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+DEFAULT_MIX = "preview=20,generate=1,count=10"
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)   # seconds, successful calls only
+    errors: int = 0
+
+    @property
+    def calls(self) -> int:
+        return len(self.latencies) + self.errors
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """'preview=20,generate=1,count=10' → {'preview': 20, 'generate': 1, 'count': 10}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("preview", "generate", "count"):
+            raise ValueError(f"Unknown endpoint in --mix: {name!r}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_vals: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+    if not sorted_vals:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_vals)))
+    return sorted_vals[rank - 1]
+
+
+def build_request(endpoint: str, small_csv: bytes, big_csv: bytes, config_json: str,
+                  generate_format: str, generate_cache: bool = False) -> tuple[str, dict, dict]:
+    """(path, files, form data) for one call to the given endpoint."""
+    if endpoint == "preview":
+        return "/preview", {"csv_file": ("orders.csv", small_csv)}, {"config_json": config_json}
+    if endpoint == "generate":
+        return ("/generate", {"csv_file": ("orders.csv", big_csv)},
+                {"config_json": config_json, "format": generate_format,
+                 "cache": "true" if generate_cache else "false"})
+    return "/count", {"csv_file": ("orders.csv", small_csv)}, {}
+
+
+async def run(args) -> tuple[dict[str, EndpointStats], float]:
+    import httpx
+
+    with open(args.small, "rb") as f:
+        small_csv = f.read()
+    with open(args.big or args.small, "rb") as f:
+        big_csv = f.read()
+    with open(args.config, encoding="utf-8") as f:
+        config_json = f.read()
+
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    schedule = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for endpoint in schedule:
+        queue.put_nowait(endpoint)
+
+    stats = {endpoint: EndpointStats() for endpoint in mix}
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = contextlib.nullcontext()
+    else:
+        from main import app
+        # Unhandled app exceptions become 500s, as under uvicorn, instead of
+        # ending the run; ASGITransport doesn't run the lifespan (warmup) itself
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://loadtest", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    async def worker():
+        while True:
+            try:
+                endpoint = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            path, files, data = build_request(endpoint, small_csv, big_csv, config_json,
+                                              args.generate_format, args.generate_cache)
+            start = time.perf_counter()
+            try:
+                resp = await client.post(path, files=files, data=data)
+                await resp.aread()
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                stats[endpoint].latencies.append(time.perf_counter() - start)
+            else:
+                stats[endpoint].errors += 1
+
+    async with lifespan, client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
+def summarize(stats: dict[str, EndpointStats], elapsed: float) -> dict[str, dict]:
+    summary = {}
+    for endpoint in sorted(stats):
+        s = stats[endpoint]
+        lat = sorted(s.latencies)
+        summary[endpoint] = {
+            "calls": s.calls,
+            "errors": s.errors,
+            "error_rate": round(s.errors / s.calls, 4) if s.calls else 0.0,
+            "throughput_rps": round(s.calls / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1),
+        }
+    return summary
+
+
+def format_table(summary: dict[str, dict]) -> str:
+    lines = [f"{'endpoint':<10} {'calls':>6} {'errors':>6} {'err%':>6} {'rps':>8} "
+             f"{'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}"]
+    for endpoint, s in summary.items():
+        lines.append(
+            f"{endpoint:<10} {s['calls']:>6} {s['errors']:>6} {s['error_rate'] * 100:>6.2f} "
+            f"{s['throughput_rps']:>8.2f} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the InvoiceKit API locally.")
+    parser.add_argument("--small", required=True, help="CSV for /preview and /count")
+    parser.add_argument("--big", help="CSV for /generate (defaults to --small)")
+    parser.add_argument("--config", required=True, help="config JSON file")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="total requests to send")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--generate-format", default="zip", help="format field for /generate")
+    parser.add_argument("--generate-cache", action="store_true",
+                        help="let repeated /generate calls be served from the artifact store")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout, seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request schedule")
+    parser.add_argument("--json", action="store_true", help="print sorted JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        sys.exit("loadtest.py needs httpx: pip install httpx")
+
+    stats, elapsed = asyncio.run(run(args))
+    summary = summarize(stats, elapsed)
+    if args.json:
+        print(json.dumps({"elapsed_s": round(elapsed, 2), "endpoints": summary}, indent=2, sort_keys=True))
+    else:
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s")
+        print(format_table(summary))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,25 +1,52 @@
 """
 main.py — InvoiceKit FastAPI backend.
-Endpoints: /health, /preview, /generate
+Endpoints: /health, /ready, /preview, /generate, /artifacts/{id}, /count
+
+ReportLab (via invoice_generator) is imported lazily and pre-warmed in the
+lifespan hook, so the process starts serving before it's loaded; /ready
+reports when the warmup has finished.
 """
 
-import io
-import json
-import zipfile
+import threading
+from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, File, Form, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
 
+from artifact_store import ARTIFACT_TYPES, artifact_id, artifact_response, find_artifact, store_artifact, stream_artifact
 from csv_parser import parse_shopify_csv
-from invoice_generator import build_invoice_pdf, build_bulk_pdf
+from output_profiles import OutputProfile, build_zip, get_output_profile, stream_tar
+from render_profile import RenderProfile, get_render_profile
 
 # ---------------------------------------------------------------------------
 # App setup
 # ---------------------------------------------------------------------------
 
-app = FastAPI(title="InvoiceKit API", version="1.0.0")
+_warm = threading.Event()
+
+
+def _warm_up():
+    try:
+        from invoice_generator import warm_up
+        warm_up()
+    except Exception as e:
+        # Warmup only primes caches — serve anyway
+        print(f"Warmup failed: {e}")
+    finally:
+        _warm.set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Off the event loop, so requests are served (and /ready answers 503) meanwhile
+    threading.Thread(target=_warm_up, name="warmup", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="InvoiceKit API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Artifact-Id", "ETag", "Content-Range"],
 )
 
 # ---------------------------------------------------------------------------
@@ -35,6 +63,14 @@ app.add_middleware(
 
 @app.get("/health")
 def health():
+    return {"status": "ok" if _warm.is_set() else "warming", "service": "InvoiceKit API"}
+
+
+@app.get("/ready")
+def ready():
+    """503 until the startup warmup invoice has rendered (deploy health check)."""
+    if not _warm.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming", "service": "InvoiceKit API"})
     return {"status": "ok", "service": "InvoiceKit API"}
 
 
@@ -48,15 +84,17 @@ async def preview(
     Generate a PDF for the FIRST order in the uploaded CSV.
     Returns the PDF bytes directly for display in an iframe.
     """
-    config = _parse_config(config_json)
+    from invoice_generator import build_invoice_pdf
+
     csv_bytes = await csv_file.read()
     logo_bytes = await logo_file.read() if logo_file else None
+    profile = _render_profile(config_json, logo_bytes)
 
     orders = parse_shopify_csv(csv_bytes)
     if not orders:
         raise HTTPException(status_code=400, detail="No valid orders found in CSV.")
 
-    pdf_bytes = build_invoice_pdf(orders[0], config, logo_bytes)
+    pdf_bytes = build_invoice_pdf(orders[0], profile)
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
@@ -66,50 +104,64 @@ async def preview(
 
 @app.post("/generate")
 async def generate(
+    request: Request,
     csv_file: UploadFile = File(...),
     config_json: str = Form(...),
-    format: str = Form("zip"),   # "single" or "zip"
+    format: str = Form("zip"),   # "single", "zip" or "tar"
+    output_profile: str = Form("default"),
+    cache: bool = Form(True),
     logo_file: Optional[UploadFile] = File(None),
 ):
     """
     Generate invoices for ALL orders in the uploaded CSV.
     format=single → single merged PDF
     format=zip    → ZIP of individual PDFs (one per order)
+    format=tar    → uncompressed TAR of individual PDFs, streamed as rendered
+    output_profile picks ZIP/PDF compression (see output_profiles.py).
+
+    Results are stored by input digest (X-Artifact-Id header): repeat calls
+    are served from the store, and GET /artifacts/{id} can resume them.
+    cache=false or `Cache-Control: no-cache` always re-renders (the result
+    is still stored).
     """
-    config = _parse_config(config_json)
+    from invoice_generator import build_bulk_pdf
+
+    output = _output_profile(output_profile)
+    if format not in ARTIFACT_TYPES:
+        format = "zip"
     csv_bytes = await csv_file.read()
     logo_bytes = await logo_file.read() if logo_file else None
+    profile = _render_profile(config_json, logo_bytes)
+
+    artifact = artifact_id(csv_bytes, profile, format, output.name)
+    no_cache = "no-cache" in request.headers.get("cache-control", "").lower()
+    stored = find_artifact(artifact) if cache and not no_cache else None
+    if stored:
+        return artifact_response(stored[0], stored[1], artifact, request.method, dict(request.headers))
 
     orders = parse_shopify_csv(csv_bytes)
     if not orders:
         raise HTTPException(status_code=400, detail="No valid orders found in CSV.")
 
     if format == "single":
-        pdf_bytes = build_bulk_pdf(orders, config, logo_bytes)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=invoices.pdf"},
-        )
+        pdf_bytes = build_bulk_pdf(orders, profile, page_compression=output.page_compression)
+        path = store_artifact(artifact, format, pdf_bytes)
+    elif format == "tar":
+        # Streamed on first request and stored even if the client drops off,
+        # so the download can be resumed from /artifacts/{id}
+        return stream_artifact(artifact, format, stream_tar(orders, profile, output))
     else:
-        # Build ZIP of individual PDFs — streamed to avoid memory bloat
-        zip_buf = io.BytesIO()
-        with zipfile.ZipFile(zip_buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for order in orders:
-                try:
-                    pdf = build_invoice_pdf(order, config, logo_bytes)
-                    name = order["order_number"].lstrip("#").replace("/", "-")
-                    zf.writestr(f"invoice_{name}.pdf", pdf)
-                except Exception as e:
-                    # Skip bad orders rather than crashing entire batch
-                    print(f"Error generating invoice {order.get('order_number')}: {e}")
-
-        zip_buf.seek(0)
-        return StreamingResponse(
-            zip_buf,
-            media_type="application/zip",
-            headers={"Content-Disposition": "attachment; filename=invoices.zip"},
-        )
+        path = store_artifact(artifact, format, build_zip(orders, profile, output))
+    return artifact_response(path, format, artifact, request.method, dict(request.headers))
+
+
+@app.api_route("/artifacts/{artifact}", methods=["GET", "HEAD"])
+def get_artifact(artifact: str, request: Request):
+    """Re-download a stored /generate result; supports ETag, Last-Modified and Range."""
+    stored = find_artifact(artifact)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired.")
+    return artifact_response(stored[0], stored[1], artifact, request.method, dict(request.headers))
 
 
 @app.post("/count")
@@ -124,8 +176,15 @@ async def count_orders(csv_file: UploadFile = File(...)):
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _parse_config(config_json: str) -> dict:
+def _render_profile(config_json: str, logo_bytes: bytes | None) -> RenderProfile:
     try:
-        return json.loads(config_json)
-    except json.JSONDecodeError as e:
+        return get_render_profile(config_json, logo_bytes)
+    except ValidationError as e:
         raise HTTPException(status_code=422, detail=f"Invalid config JSON: {e}")
+
+
+def _output_profile(name: str) -> OutputProfile:
+    try:
+        return get_output_profile(name)
+    except KeyError:
+        raise HTTPException(status_code=422, detail=f"Unknown output_profile: {name}")
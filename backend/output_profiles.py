@@ -0,0 +1,103 @@
+"""
+output_profiles.py — How bulk invoices are encoded for download.
+
+An output profile picks the ZIP compression (stored or deflate at a level)
+and whether ReportLab compresses page content streams. The archive itself
+is chosen by /generate's `format`: a ZIP built in memory, or an
+uncompressed TAR streamed while invoices are rendered.
+
+Run bench_output_profiles.py to compare CPU time and bytes per profile.
+"""
+
+import io
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from render_profile import RenderProfile
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    name: str
+    zip_compression: int           # zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED
+    zip_level: Optional[int]       # deflate level 1-9, None = zlib default (6)
+    page_compression: bool         # ReportLab content-stream compression
+
+
+# PDFs come out of ReportLab already compressed, so deflating them again
+# mostly burns CPU: "stored" is the fast choice, "smallest" the email one.
+# "deflate-1" … "deflate-9" pick an explicit deflate level.
+OUTPUT_PROFILES: dict[str, OutputProfile] = {
+    p.name: p for p in [
+        OutputProfile("default", zipfile.ZIP_DEFLATED, None, True),
+        OutputProfile("stored", zipfile.ZIP_STORED, None, True),
+        *(OutputProfile(f"deflate-{level}", zipfile.ZIP_DEFLATED, level, True) for level in range(1, 10)),
+        OutputProfile("smallest", zipfile.ZIP_DEFLATED, 9, True),
+        OutputProfile("fastest", zipfile.ZIP_STORED, None, False),
+    ]
+}
+
+
+def get_output_profile(name: str) -> OutputProfile:
+    """Look up a profile by name. Raises KeyError for unknown names."""
+    return OUTPUT_PROFILES[name]
+
+
+def build_zip(orders: list[dict], profile: RenderProfile, output: OutputProfile) -> bytes:
+    """ZIP of individual PDFs (one per order), encoded per the output profile."""
+    return encode_zip(_invoice_files(orders, profile, output), output)
+
+
+def stream_tar(orders: list[dict], profile: RenderProfile, output: OutputProfile) -> Iterator[bytes]:
+    """
+    Uncompressed TAR of individual PDFs, yielded member by member as each
+    invoice is rendered so the first bytes go out before the batch finishes.
+    """
+    return encode_tar(_invoice_files(orders, profile, output))
+
+
+def encode_zip(files: Iterable[tuple[str, bytes]], output: OutputProfile) -> bytes:
+    """ZIP already-rendered (filename, pdf) pairs with the profile's compression."""
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, mode="w", compression=output.zip_compression,
+                         compresslevel=output.zip_level) as zf:
+        for filename, pdf in files:
+            zf.writestr(filename, pdf)
+    return zip_buf.getvalue()
+
+
+def encode_tar(files: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+    """Uncompressed TAR of (filename, pdf) pairs, one chunk per member."""
+    written = 0
+    mtime = int(time.time())
+    for filename, pdf in files:
+        info = tarfile.TarInfo(filename)
+        info.size = len(pdf)
+        info.mtime = mtime
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        padding = -len(pdf) % tarfile.BLOCKSIZE
+        yield header + pdf + tarfile.NUL * padding
+        written += len(header) + len(pdf) + padding
+
+    # End-of-archive marker, then pad to a full record like tarfile does
+    trailer = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    written += len(trailer)
+    yield trailer + tarfile.NUL * (-written % tarfile.RECORDSIZE)
+
+
+def _invoice_files(orders: list[dict], profile: RenderProfile,
+                   output: OutputProfile) -> Iterator[tuple[str, bytes]]:
+    from invoice_generator import build_invoice_pdf
+
+    for order in orders:
+        try:
+            pdf = build_invoice_pdf(order, profile, page_compression=output.page_compression)
+            name = order["order_number"].lstrip("#").replace("/", "-")
+            yield f"invoice_{name}.pdf", pdf
+        except Exception as e:
+            # Skip bad orders rather than crashing entire batch
+            print(f"Error generating invoice {order.get('order_number')}: {e}")
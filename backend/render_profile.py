@@ -0,0 +1,178 @@
+"""
+render_profile.py — Validated invoice config compiled into an immutable render profile.
+
+config_json is validated once into typed models, then compiled into a
+RenderProfile holding everything that does not depend on the order:
+seller/footer text, the tax-rule index and the prepared logo.
+Profiles are cached by (config hash, logo hash) across requests.
+"""
+
+import hashlib
+import io
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from tax_logic import TaxRuleIndex, compile_tax_rules
+
+# Logo is drawn into a 40mm x 15mm box (see invoice_generator._header);
+# anything above 300 DPI at that size is invisible but still costs per PDF.
+LOGO_BOX_PX = (472, 177)
+
+PROFILE_CACHE_SIZE = 32
+
+
+# ---------------------------------------------------------------------------
+# Config models (mirror frontend/lib/types.ts)
+# ---------------------------------------------------------------------------
+
+class CompanyConfig(BaseModel):
+    # Numeric fields (e.g. "hsn_code": 6109) are accepted as text, as before validation
+    model_config = ConfigDict(frozen=True, extra="ignore", coerce_numbers_to_str=True)
+
+    name: str = ""
+    gstin: str = ""
+    address: str = ""
+    email: str = ""
+    website: str = ""
+    seller_state: str = ""
+    seller_state_code: str = ""
+    shipped_from: str = ""
+    hsn_code: str = ""
+    transport_mode: str = ""
+    invoice_prefix: str = ""
+    invoice_start_number: Optional[int] = None
+
+
+class TaxRule(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True,
+                              coerce_numbers_to_str=True)
+
+    from_: Optional[str] = Field("", alias="from")
+    to: Optional[str] = None
+    rate: float
+
+
+class InvoiceConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+    company: CompanyConfig = CompanyConfig()
+    tax_rules: list[TaxRule] = []
+
+
+# ---------------------------------------------------------------------------
+# Render profile
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RenderProfile:
+    config_digest: str
+    logo_digest: str
+    tax_rules: TaxRuleIndex
+    seller_state: str
+    hsn_code: str
+    invoice_prefix: str
+    invoice_start_number: Optional[int]
+    company_name: str
+    seller_lines: tuple[str, ...]   # "Sold By" block, after the bold name
+    footer_lines: tuple[str, ...]
+    logo: Optional[bytes]           # prepared (downscaled) logo, None if absent/unreadable
+
+    def invoice_number(self, offset: int = 0) -> Optional[str]:
+        """Serial number for the offset-th invoice of a batch, or None if numbering is off."""
+        if self.invoice_prefix and self.invoice_start_number is not None:
+            return f"{self.invoice_prefix}{self.invoice_start_number + offset:03d}"
+        return None
+
+
+def compile_render_profile(config: InvoiceConfig, logo_bytes: bytes | None = None,
+                           config_digest: str = "", logo_digest: str = "") -> RenderProfile:
+    """Precompute every order-independent part of an invoice from a validated config."""
+    company = config.company
+
+    seller_lines = [
+        company.address,
+        f"GSTIN: {company.gstin}",
+        f"State: {company.seller_state} ({company.seller_state_code})",
+    ]
+    if company.email:
+        seller_lines.append(f"Email: {company.email}")
+    if company.website:
+        seller_lines.append(f"Web: {company.website}")
+
+    footer_lines = [
+        f"This is a computer-generated invoice. | {company.name} | GSTIN: {company.gstin}",
+    ]
+    if company.shipped_from:
+        footer_lines.append(f"Shipped from: {company.shipped_from}")
+    if company.transport_mode:
+        footer_lines.append(f"Transport: {company.transport_mode}")
+
+    return RenderProfile(
+        config_digest=config_digest,
+        logo_digest=logo_digest,
+        tax_rules=compile_tax_rules(
+            [rule.model_dump(by_alias=True) for rule in config.tax_rules]
+        ),
+        seller_state=company.seller_state,
+        hsn_code=company.hsn_code,
+        invoice_prefix=company.invoice_prefix,
+        invoice_start_number=company.invoice_start_number,
+        company_name=company.name,
+        seller_lines=tuple(seller_lines),
+        footer_lines=tuple(footer_lines),
+        logo=_prepare_logo(logo_bytes) if logo_bytes else None,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+_profiles: "OrderedDict[tuple[str, str], RenderProfile]" = OrderedDict()
+
+
+def get_render_profile(config_json: str, logo_bytes: bytes | None = None) -> RenderProfile:
+    """
+    Return the compiled profile for this config/logo pair, compiling it on first use.
+    Raises pydantic.ValidationError if config_json is not valid JSON or has bad field types.
+    """
+    key = (_digest(config_json.encode("utf-8")), _digest(logo_bytes))
+    profile = _profiles.get(key)
+    if profile is not None:
+        _profiles.move_to_end(key)
+        return profile
+
+    config = InvoiceConfig.model_validate_json(config_json)
+    profile = compile_render_profile(config, logo_bytes, config_digest=key[0], logo_digest=key[1])
+    _profiles[key] = profile
+    while len(_profiles) > PROFILE_CACHE_SIZE:
+        _profiles.popitem(last=False)
+    return profile
+
+
+def _digest(data: bytes | None) -> str:
+    return hashlib.sha256(data).hexdigest() if data else ""
+
+
+def _prepare_logo(logo_bytes: bytes) -> bytes | None:
+    """
+    Decode the logo once and shrink it to the size it is actually drawn at.
+    Returns None for images Pillow can't read, so the header falls back to the company name.
+    """
+    from PIL import Image as PILImage
+
+    try:
+        with PILImage.open(io.BytesIO(logo_bytes)) as img:
+            img.load()
+            if img.width <= LOGO_BOX_PX[0] and img.height <= LOGO_BOX_PX[1]:
+                return logo_bytes
+            fmt = "JPEG" if img.format == "JPEG" else "PNG"
+            img.thumbnail(LOGO_BOX_PX)
+            out = io.BytesIO()
+            img.save(out, format=fmt)
+            return out.getvalue()
+    except Exception:
+        return None
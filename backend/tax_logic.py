@@ -9,7 +9,13 @@ Rules:
 """
 
 from datetime import date, datetime
-from typing import Any
+from typing import Any, NamedTuple
+
+
+class TaxRuleIndex(NamedTuple):
+    """Tax rules with dates pre-parsed: ((from, to | None, rate), ...) + fallback rate."""
+    ranges: tuple[tuple[date, date | None, float], ...]
+    fallback_rate: float
 
 
 def get_gst_rate(created_at: str, tax_rules: list[dict]) -> float:
@@ -19,27 +25,41 @@ def get_gst_rate(created_at: str, tax_rules: list[dict]) -> float:
 
     tax_rules: [{"from": "YYYY-MM-DD", "to": "YYYY-MM-DD" | null, "rate": 5}, ...]
     """
-    order_date = _parse_date(created_at)
-    if order_date is None:
-        # Default to last rule's rate if date unparseable
-        return float(tax_rules[-1]["rate"]) if tax_rules else 0.0
+    return lookup_gst_rate(created_at, compile_tax_rules(tax_rules))
 
+
+def compile_tax_rules(tax_rules: list[dict]) -> TaxRuleIndex:
+    """
+    Parse the rule dates once so per-order lookups only parse the order date.
+    Rules without a usable "from" date are dropped, exactly as get_gst_rate
+    skips them; the fallback rate is still taken from the last rule given.
+    """
+    ranges = []
     for rule in tax_rules:
         rule_from = _parse_date(rule.get("from", ""))
+        if rule_from is None:
+            continue
         rule_to_raw = rule.get("to")
         rule_to = _parse_date(rule_to_raw) if rule_to_raw else None
+        ranges.append((rule_from, rule_to, float(rule["rate"])))
 
-        if rule_from is None:
-            continue
+    fallback = float(tax_rules[-1]["rate"]) if tax_rules else 0.0
+    return TaxRuleIndex(ranges=tuple(ranges), fallback_rate=fallback)
 
-        after_start = order_date >= rule_from
-        before_end = (rule_to is None) or (order_date <= rule_to)
 
-        if after_start and before_end:
-            return float(rule["rate"])
+def lookup_gst_rate(created_at: str, index: TaxRuleIndex) -> float:
+    """Same as get_gst_rate, against rules already compiled by compile_tax_rules."""
+    order_date = _parse_date(created_at)
+    if order_date is None:
+        # Default to last rule's rate if date unparseable
+        return index.fallback_rate
+
+    for rule_from, rule_to, rate in index.ranges:
+        if order_date >= rule_from and (rule_to is None or order_date <= rule_to):
+            return rate
 
     # Fallback: last rule
-    return float(tax_rules[-1]["rate"]) if tax_rules else 0.0
+    return index.fallback_rate
 
 
 def get_gst_type(billing_province_name: str, seller_state: str) -> str:
@@ -56,10 +76,14 @@ def compute_tax_breakdown(order: dict[str, Any], config: dict) -> dict[str, Any]
     Given an order dict and config, compute all GST-related fields.
     Returns a dict with tax amounts, type, rate, and per-item breakdown.
     """
-    tax_rules = config.get("tax_rules", [])
+    tax_rules = compile_tax_rules(config.get("tax_rules", []))
     seller_state = config.get("company", {}).get("seller_state", "")
+    return compute_order_tax(order, tax_rules, seller_state)
 
-    rate = get_gst_rate(order["created_at"], tax_rules)
+
+def compute_order_tax(order: dict[str, Any], tax_rules: TaxRuleIndex, seller_state: str) -> dict[str, Any]:
+    """compute_tax_breakdown against pre-compiled rules (see render_profile.py)."""
+    rate = lookup_gst_rate(order["created_at"], tax_rules)
     gst_type = get_gst_type(order["billing_province_name"], seller_state)
 
     subtotal = order["subtotal"]
@@ -117,6 +141,13 @@ def compute_tax_breakdown(order: dict[str, Any], config: dict) -> dict[str, Any]
 def _parse_date(val: str) -> date | None:
     if not val:
         return None
+    # Shopify's "2025-01-15 10:00:00 +0530" and plain ISO dates: match none of
+    # the formats below (val is sliced to the format's length), so without this
+    # every order would fall through to dateutil
+    try:
+        return date.fromisoformat(val[:10])
+    except ValueError:
+        pass
     for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
         try:
             return datetime.strptime(val[:len(fmt)], fmt).date()